@@ -4,10 +4,19 @@ AXI Interface Test Script for GPU and RISC-V CPU
 Tests read/write operations to both peripherals
 """
 
+import io
 import mmap
 import os
 import struct
+import sys
+import threading
 import time
+import traceback
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Base addresses from your memory map
 GPU_BASE = 0x4300_0000
@@ -30,6 +39,10 @@ GPU_MATH_B      = 0x84
 GPU_MATH_OP     = 0x88
 GPU_MATH_RESULT = 0x8C
 
+# Framebuffer geometry (8-bit pixels, row-major)
+FB_WIDTH  = 320
+FB_HEIGHT = 200
+
 # GPU Commands
 CMD_NOP         = 0x00
 CMD_CLEAR       = 0x01
@@ -58,21 +71,57 @@ CTRL_RUN   = 0x01
 CTRL_RESET = 0x02
 CTRL_STEP  = 0x04
 
+# GPU Status bits
+STATUS_BUSY = 0x01
+STATUS_DONE = 0x02
+
+# Precompiled little-endian 32-bit register format
+_U32 = struct.Struct('<I')
+# GPU_MATH_A, GPU_MATH_B and GPU_MATH_OP are contiguous
+_MATH_ARGS = struct.Struct('<III')
+
+def _register(offset, writable=True):
+    """Build a property for the 32-bit register at a fixed offset"""
+    def fget(self, _unpack_from=_U32.unpack_from, _offset=offset):
+        return _unpack_from(self.mem, _offset)[0]
+    if not writable:
+        return property(fget)
+    def fset(self, value, _pack_into=_U32.pack_into, _offset=offset):
+        _pack_into(self.mem, _offset, value & 0xFFFFFFFF)
+    return property(fget, fset)
+
 class AXIDevice:
-    """Helper class for AXI register access"""
-    def __init__(self, base_addr, size=0x10000):
+    """Helper class for AXI register access
+
+    Pass an already open /dev/mem descriptor as fd to share it between
+    devices; it is then left open on close().
+    """
+    # No per-instance __dict__, so assigning a register name that the
+    # device does not have raises AttributeError instead of being ignored
+    __slots__ = ('base_addr', 'size', 'fd', 'owns_fd', 'mem', 'view')
+
+    def __init__(self, base_addr, size=0x10000, fd=None):
         self.base_addr = base_addr
         self.size = size
+        self.fd = fd
+        self.owns_fd = fd is None
         self.mem = None
+        self.view = None
 
     def open(self):
-        """Open /dev/mem and map the device"""
+        """Open /dev/mem (unless shared) and map the device"""
         try:
-            self.fd = os.open('/dev/mem', os.O_RDWR | os.O_SYNC)
+            if self.fd is None:
+                self.fd = os.open('/dev/mem', os.O_RDWR)
+            # Ask for the page tables up front where supported (Python 3.10+)
+            flags = mmap.MAP_SHARED | getattr(mmap, 'MAP_POPULATE', 0)
             self.mem = mmap.mmap(self.fd, self.size,
-                                mmap.MAP_SHARED,
+                                flags,
                                 mmap.PROT_READ | mmap.PROT_WRITE,
                                 offset=self.base_addr)
+            if np is not None:
+                # Word-indexed view over the register window
+                self.view = np.frombuffer(self.mem, dtype='<u4')
             return True
         except Exception as e:
             print(f"Error opening device at 0x{self.base_addr:08X}: {e}")
@@ -80,21 +129,39 @@ class AXIDevice:
 
     def close(self):
         """Close the memory mapping"""
+        # The view holds an export of the mmap buffer; drop it first
+        self.view = None
         if self.mem:
             self.mem.close()
-        if hasattr(self, 'fd'):
+            self.mem = None
+        if self.owns_fd and self.fd is not None:
             os.close(self.fd)
+            self.fd = None
 
     def write32(self, offset, value):
         """Write 32-bit value to register"""
-        self.mem.seek(offset)
-        self.mem.write(struct.pack('<I', value & 0xFFFFFFFF))
-        # No flush needed - mmap with O_SYNC writes immediately
+        _U32.pack_into(self.mem, offset, value & 0xFFFFFFFF)
+        # No flush needed - /dev/mem maps addresses outside system RAM as
+        # uncached device memory, so the store goes straight to the bus
 
     def read32(self, offset):
         """Read 32-bit value from register"""
-        self.mem.seek(offset)
-        return struct.unpack('<I', self.mem.read(4))[0]
+        return _U32.unpack_from(self.mem, offset)[0]
+
+    def write_block(self, offset, values):
+        """Write a contiguous run of 32-bit values in one copy"""
+        values = [v & 0xFFFFFFFF for v in values]
+        if self.view is not None:
+            self.view[offset//4:offset//4 + len(values)] = np.asarray(values, dtype='<u4')
+            return
+        self.mem[offset:offset+4*len(values)] = struct.pack(
+            f'<{len(values)}I', *values)
+
+    def read_block(self, offset, count):
+        """Read a contiguous run of 32-bit values in one copy"""
+        if self.view is not None:
+            return self.view[offset//4:offset//4 + count].tolist()
+        return list(struct.unpack_from(f'<{count}I', self.mem, offset))
 
     def __enter__(self):
         self.open()
@@ -103,239 +170,353 @@ class AXIDevice:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
-def test_gpu_basic_rw():
+class GPUDevice(AXIDevice):
+    """GPU peripheral with its hot registers bound as properties"""
+    __slots__ = ()
+
+    id          = _register(GPU_ID, writable=False)
+    status      = _register(GPU_STATUS, writable=False)
+    control     = _register(GPU_CONTROL)
+    cmd         = _register(GPU_CMD)
+    color       = _register(GPU_COLOR)
+    math_result = _register(GPU_MATH_RESULT, writable=False)
+
+    def wait_done(self, timeout_s=0.1):
+        """Poll GPU_STATUS until the last command has completed.
+
+        The done bit is only a one-cycle pulse, so completion is detected by
+        the busy bit dropping. Returns False if the GPU is still busy after
+        timeout_s seconds.
+        """
+        deadline = time.perf_counter() + timeout_s
+        while self.status & STATUS_BUSY:
+            if time.perf_counter() > deadline:
+                return False
+        return True
+
+    def write_math(self, a, b, op):
+        """Write the math operands and operation in one contiguous burst"""
+        _MATH_ARGS.pack_into(self.mem, GPU_MATH_A,
+                             a & 0xFFFFFFFF, b & 0xFFFFFFFF, op & 0xFFFFFFFF)
+
+    def draw_pixels(self, pixels, timeout_s=0.1):
+        """Draw an iterable of (x, y, color) pixels with CMD_DRAW_PIXEL.
+
+        The command processor ignores commands while busy, so each pixel
+        waits for the previous one to finish. Coordinates are masked to
+        16 bits and color to 8 bits, as the registers hold them.
+
+        Returns the number of pixels completed. A count short of the
+        input means the GPU timed out, either before the first pixel or
+        on the pixel after the last one counted.
+        """
+        mem = self.mem
+        pack_into = _U32.pack_into
+        if not self.wait_done(timeout_s):
+            return 0
+        drawn = 0
+        for x, y, color in pixels:
+            pack_into(mem, GPU_COLOR, color & 0xFF)
+            # y in upper 16 bits, x in lower
+            pack_into(mem, GPU_ARG0, ((y & 0xFFFF) << 16) | (x & 0xFFFF))
+            pack_into(mem, GPU_CMD, CMD_DRAW_PIXEL)
+            if not self.wait_done(timeout_s):
+                return drawn
+            drawn += 1
+        return drawn
+
+    def read_fb_rect(self, x, y, w, h):
+        """Read a w x h block of framebuffer pixels starting at (x, y).
+
+        FB_DATA does not auto-increment, so each pixel is one GPU_FB_READ
+        write plus one GPU_FB_DATA read. Raises ValueError if the block
+        does not fit inside the framebuffer.
+
+        Returns an (h, w) uint8 array, or a list of h bytearray rows when
+        NumPy is not available. Callers should only rely on what both
+        share: len(result) == h and result[row][col] is the pixel value.
+        """
+        if (x < 0 or y < 0 or w < 0 or h < 0
+                or x + w > FB_WIDTH or y + h > FB_HEIGHT):
+            raise ValueError(f"{w}x{h} block at ({x}, {y}) is outside the "
+                             f"{FB_WIDTH}x{FB_HEIGHT} framebuffer")
+        mem = self.mem
+        pack_into = _U32.pack_into
+        unpack_from = _U32.unpack_from
+        rows = []
+        for row_start in range(y*FB_WIDTH + x, (y + h)*FB_WIDTH + x, FB_WIDTH):
+            row = bytearray(w)
+            for i in range(w):
+                pack_into(mem, GPU_FB_READ, row_start + i)
+                row[i] = unpack_from(mem, GPU_FB_DATA)[0] & 0xFF
+            rows.append(row)
+        if np is None:
+            return rows
+        return np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(h, w)
+
+class CPUDevice(AXIDevice):
+    """RISC-V CPU peripheral with its hot registers bound as properties"""
+    __slots__ = ()
+
+    ctrl   = _register(CPU_CTRL)
+    status = _register(CPU_STATUS, writable=False)
+    pc     = _register(CPU_PC)
+
+def test_gpu_basic_rw(gpu, out):
     """Test basic GPU read/write operations"""
-    print("\n" + "="*60)
-    print("GPU BASIC READ/WRITE TEST")
-    print("="*60)
-
-    with AXIDevice(GPU_BASE) as gpu:
-        # Test 1: Read GPU ID
-        print("\n1. Reading GPU ID...")
-        gpu_id = gpu.read32(GPU_ID)
-        print(f"   GPU ID: 0x{gpu_id:08X}")
-        expected_id = 0xABCD1234
-        if gpu_id == expected_id:
-            print(f"   ✓ PASS - ID matches expected (0x{expected_id:08X})")
-        else:
-            print(f"   ✗ FAIL - Expected 0x{expected_id:08X}, got 0x{gpu_id:08X}")
-
-        # Test 2: Read initial status
-        print("\n2. Reading initial status...")
-        status = gpu.read32(GPU_STATUS)
-        busy = status & 0x01
-        done = (status >> 1) & 0x01
-        print(f"   Status: 0x{status:08X} (busy={busy}, done={done})")
-
-        # Test 3: Write/Read control register
-        print("\n3. Testing control register...")
-        test_value = 0x12345678
-        gpu.write32(GPU_CONTROL, test_value)
-        time.sleep(0.001)
-        read_value = gpu.read32(GPU_CONTROL)
-        if read_value == test_value:
-            print(f"   ✓ PASS - Control register R/W (0x{test_value:08X})")
-        else:
-            print(f"   ✗ FAIL - Wrote 0x{test_value:08X}, read 0x{read_value:08X}")
-
-        # Test 4: Write/Read color register
-        print("\n4. Testing color register...")
-        test_color = 0xFF
-        gpu.write32(GPU_COLOR, test_color)
-        time.sleep(0.001)
-        read_color = gpu.read32(GPU_COLOR) & 0xFF
-        if read_color == test_color:
-            print(f"   ✓ PASS - Color register R/W (0x{test_color:02X})")
-        else:
-            print(f"   ✗ FAIL - Wrote 0x{test_color:02X}, read 0x{read_color:02X}")
-
-        # Test 5: Write/Read argument registers
-        print("\n5. Testing argument registers...")
-        test_args = [0x11111111, 0x22222222, 0x33333333, 0x44444444]
-        offsets = [GPU_ARG0, GPU_ARG1, GPU_ARG2, GPU_ARG3]
-        all_pass = True
-        for i, (offset, value) in enumerate(zip(offsets, test_args)):
-            gpu.write32(offset, value)
-            time.sleep(0.001)
-            read_value = gpu.read32(offset)
-            if read_value == value:
-                print(f"   ✓ ARG{i}: 0x{value:08X}")
-            else:
-                print(f"   ✗ ARG{i}: Wrote 0x{value:08X}, read 0x{read_value:08X}")
-                all_pass = False
-        if all_pass:
-            print("   ✓ PASS - All argument registers")
-
-def test_gpu_math_unit():
+    print("\n" + "="*60, file=out)
+    print("GPU BASIC READ/WRITE TEST", file=out)
+    print("="*60, file=out)
+
+    # Test 1: Read GPU ID
+    print("\n1. Reading GPU ID...", file=out)
+    gpu_id = gpu.id
+    print(f"   GPU ID: 0x{gpu_id:08X}", file=out)
+    expected_id = 0xABCD1234
+    if gpu_id == expected_id:
+        print(f"   ✓ PASS - ID matches expected (0x{expected_id:08X})", file=out)
+    else:
+        print(f"   ✗ FAIL - Expected 0x{expected_id:08X}, got 0x{gpu_id:08X}", file=out)
+
+    # Test 2: Read initial status
+    print("\n2. Reading initial status...", file=out)
+    status = gpu.status
+    busy = int(bool(status & STATUS_BUSY))
+    done = int(bool(status & STATUS_DONE))
+    print(f"   Status: 0x{status:08X} (busy={busy}, done={done})", file=out)
+
+    # Test 3: Write/Read control register
+    print("\n3. Testing control register...", file=out)
+    test_value = 0x12345678
+    gpu.control = test_value
+    read_value = gpu.control
+    if read_value == test_value:
+        print(f"   ✓ PASS - Control register R/W (0x{test_value:08X})", file=out)
+    else:
+        print(f"   ✗ FAIL - Wrote 0x{test_value:08X}, read 0x{read_value:08X}", file=out)
+
+    # Test 4: Write/Read color register
+    print("\n4. Testing color register...", file=out)
+    test_color = 0xFF
+    gpu.color = test_color
+    read_color = gpu.color & 0xFF
+    if read_color == test_color:
+        print(f"   ✓ PASS - Color register R/W (0x{test_color:02X})", file=out)
+    else:
+        print(f"   ✗ FAIL - Wrote 0x{test_color:02X}, read 0x{read_color:02X}", file=out)
+
+    # Test 5: Write/Read argument registers
+    print("\n5. Testing argument registers...", file=out)
+    test_args = [0x11111111, 0x22222222, 0x33333333, 0x44444444]
+    gpu.write_block(GPU_ARG0, test_args)  # ARG0..ARG3 are contiguous
+    # Read the block once and report pass or fail from that same data
+    readback = gpu.read_block(GPU_ARG0, len(test_args))
+    if readback == test_args:
+        print(f"   ✓ PASS - All {len(test_args)} argument registers", file=out)
+    else:
+        print("\n".join(
+            f"   ✗ ARG{i}: Wrote 0x{value:08X}, read 0x{read_value:08X}"
+            for i, (value, read_value) in enumerate(zip(test_args, readback))
+            if read_value != value), file=out)
+
+def test_gpu_math_unit(gpu, out):
     """Test GPU math unit"""
-    print("\n" + "="*60)
-    print("GPU MATH UNIT TEST")
-    print("="*60)
-
-    with AXIDevice(GPU_BASE) as gpu:
-        test_cases = [
-            (100, 50, MATH_ADD, 150, "ADD"),
-            (100, 50, MATH_SUB, 50, "SUB"),
-            (12, 5, MATH_MUL, 60, "MUL"),
-            (100, 4, MATH_DIV, 25, "DIV"),
-        ]
-
-        for a, b, op, expected, name in test_cases:
-            print(f"\n{name}: {a} {['+', '-', '*', '/'][op]} {b}")
-
-            # Write operands
-            gpu.write32(GPU_MATH_A, a)
-            gpu.write32(GPU_MATH_B, b)
-            gpu.write32(GPU_MATH_OP, op)
+    print("\n" + "="*60, file=out)
+    print("GPU MATH UNIT TEST", file=out)
+    print("="*60, file=out)
 
-            # Trigger operation
-            gpu.write32(GPU_CMD, CMD_MATH_OP)
+    test_cases = [
+        (100, 50, MATH_ADD, 150, "ADD"),
+        (100, 50, MATH_SUB, 50, "SUB"),
+        (12, 5, MATH_MUL, 60, "MUL"),
+        (100, 4, MATH_DIV, 25, "DIV"),
+    ]
 
-            # Wait for completion
-            time.sleep(0.01)
-
-            # Read result
-            result = gpu.read32(GPU_MATH_RESULT)
-
-            if result == expected:
-                print(f"   ✓ PASS - Result: {result}")
-            else:
-                print(f"   ✗ FAIL - Expected {expected}, got {result}")
-
-def test_gpu_pixel_draw():
-    """Test GPU pixel drawing"""
-    print("\n" + "="*60)
-    print("GPU PIXEL DRAW TEST")
-    print("="*60)
+    for a, b, op, expected, name in test_cases:
+        print(f"\n{name}: {a} {['+', '-', '*', '/'][op]} {b}", file=out)
 
-    with AXIDevice(GPU_BASE) as gpu:
-        # Draw a pixel at (10, 20) with color 0xFF
-        print("\n1. Drawing pixel at (10, 20) with color 0xFF...")
-        x, y = 10, 20
-        color = 0xFF
+        # Write operands and operation in one burst
+        gpu.write_math(a, b, op)
 
-        gpu.write32(GPU_COLOR, color)
-        gpu.write32(GPU_ARG0, (y << 16) | x)  # y in upper 16 bits, x in lower
-        gpu.write32(GPU_CMD, CMD_DRAW_PIXEL)
+        # Trigger operation
+        gpu.cmd = CMD_MATH_OP
 
         # Wait for completion
-        time.sleep(0.01)
+        if not gpu.wait_done():
+            print("   ✗ FAIL - Timed out waiting for GPU", file=out)
+            continue
 
-        # Read back the pixel
-        fb_addr = y * 320 + x  # 320 is FB_WIDTH
-        gpu.write32(GPU_FB_READ, fb_addr)
-        time.sleep(0.001)
-        pixel_value = gpu.read32(GPU_FB_DATA) & 0xFF
+        # Read result
+        result = gpu.math_result
 
-        if pixel_value == color:
-            print(f"   ✓ PASS - Pixel written and read correctly (0x{color:02X})")
+        if result == expected:
+            print(f"   ✓ PASS - Result: {result}", file=out)
         else:
-            print(f"   ✗ FAIL - Expected 0x{color:02X}, read 0x{pixel_value:02X}")
+            print(f"   ✗ FAIL - Expected {expected}, got {result}", file=out)
 
-def test_cpu_basic_rw():
+def test_gpu_pixel_draw(gpu, out):
+    """Test GPU pixel drawing"""
+    print("\n" + "="*60, file=out)
+    print("GPU PIXEL DRAW TEST", file=out)
+    print("="*60, file=out)
+
+    # Draw a pixel at (10, 20) with color 0xFF
+    print("\n1. Drawing pixel at (10, 20) with color 0xFF...", file=out)
+    x, y = 10, 20
+    color = 0xFF
+
+    if gpu.draw_pixels([(x, y, color)]) != 1:
+        print("   ✗ FAIL - Timed out waiting for GPU", file=out)
+        return
+
+    # Read back the pixel
+    pixel_value = int(gpu.read_fb_rect(x, y, 1, 1)[0][0])
+
+    if pixel_value == color:
+        print(f"   ✓ PASS - Pixel written and read correctly (0x{color:02X})", file=out)
+    else:
+        print(f"   ✗ FAIL - Expected 0x{color:02X}, read 0x{pixel_value:02X}", file=out)
+
+    # Draw a horizontal run of pixels with a color gradient
+    print("\n2. Drawing 16-pixel run at (10, 30)...", file=out)
+    y = 30
+    pixels = [(10 + i, y, 0x10 * i + 0x0F) for i in range(16)]
+    start = time.perf_counter()
+    if gpu.draw_pixels(pixels) != len(pixels):
+        print("   ✗ FAIL - Timed out waiting for GPU", file=out)
+        return
+    elapsed = time.perf_counter() - start
+    print(f"   Drew {len(pixels)} pixels in {elapsed*1e6:.0f} us", file=out)
+
+    row = gpu.read_fb_rect(10, y, len(pixels), 1)[0]
+    fails = []
+    for (x, y, color), pixel_value in zip(pixels, map(int, row)):
+        if pixel_value != color:
+            fails.append(f"   ✗ ({x}, {y}): Expected 0x{color:02X}, read 0x{pixel_value:02X}")
+    if not fails:
+        print(f"   ✓ PASS - {len(pixels)} pixels written and read correctly", file=out)
+    else:
+        print("\n".join(fails), file=out)
+
+def test_cpu_basic_rw(cpu, out):
     """Test basic CPU read/write operations"""
-    print("\n" + "="*60)
-    print("CPU BASIC READ/WRITE TEST")
-    print("="*60)
-
-    with AXIDevice(CPU_BASE) as cpu:
-        # Test 1: Read initial status
-        print("\n1. Reading initial CPU status...")
-        status = cpu.read32(CPU_STATUS)
-        print(f"   Status: 0x{status:08X}")
-
-        # Test 2: Read initial PC
-        print("\n2. Reading initial PC...")
-        pc = cpu.read32(CPU_PC)
-        print(f"   PC: 0x{pc:08X}")
-
-        # Test 3: Write/Read control register
-        print("\n3. Testing control register...")
-        cpu.write32(CPU_CTRL, CTRL_RESET)
-        time.sleep(0.01)
-        ctrl = cpu.read32(CPU_CTRL)
-        print(f"   Control: 0x{ctrl:08X}")
-
-        # Test 4: Write to PC
-        print("\n4. Writing to PC...")
-        test_pc = 0x100
-        cpu.write32(CPU_PC, test_pc)
-        time.sleep(0.01)
-        read_pc = cpu.read32(CPU_PC)
-        if read_pc == test_pc:
-            print(f"   ✓ PASS - PC write successful (0x{test_pc:08X})")
-        else:
-            print(f"   ✗ FAIL - Wrote 0x{test_pc:08X}, read 0x{read_pc:08X}")
-
-def test_cpu_instruction_memory():
+    print("\n" + "="*60, file=out)
+    print("CPU BASIC READ/WRITE TEST", file=out)
+    print("="*60, file=out)
+
+    # Test 1: Read initial status
+    print("\n1. Reading initial CPU status...", file=out)
+    status = cpu.status
+    print(f"   Status: 0x{status:08X}", file=out)
+
+    # Test 2: Read initial PC
+    print("\n2. Reading initial PC...", file=out)
+    pc = cpu.pc
+    print(f"   PC: 0x{pc:08X}", file=out)
+
+    # Test 3: Write/Read control register
+    print("\n3. Testing control register...", file=out)
+    cpu.ctrl = CTRL_RESET
+    time.sleep(0.01)
+    ctrl = cpu.ctrl
+    print(f"   Control: 0x{ctrl:08X}", file=out)
+
+    # Test 4: Write to PC
+    print("\n4. Writing to PC...", file=out)
+    test_pc = 0x100
+    cpu.pc = test_pc
+    read_pc = cpu.pc
+    if read_pc == test_pc:
+        print(f"   ✓ PASS - PC write successful (0x{test_pc:08X})", file=out)
+    else:
+        print(f"   ✗ FAIL - Wrote 0x{test_pc:08X}, read 0x{read_pc:08X}", file=out)
+
+def test_cpu_instruction_memory(cpu, out):
     """Test CPU instruction memory read/write"""
-    print("\n" + "="*60)
-    print("CPU INSTRUCTION MEMORY TEST")
-    print("="*60)
-
-    with AXIDevice(CPU_BASE) as cpu:
-        print("\n1. Writing instructions to memory...")
-
-        # Simple test program:
-        # 0x00: ADDI x1, x0, 5    (x1 = 5)
-        # 0x04: ADDI x2, x0, 10   (x2 = 10)
-        # 0x08: ADD  x3, x1, x2   (x3 = x1 + x2 = 15)
-        instructions = [
-            0x00500093,  # ADDI x1, x0, 5
-            0x00A00113,  # ADDI x2, x0, 10
-            0x002081B3,  # ADD x3, x1, x2
-        ]
-
-        for i, instr in enumerate(instructions):
-            offset = CPU_INSTR_BASE + (i * 4)
-            cpu.write32(offset, instr)
-            time.sleep(0.001)  # Small delay after write
-            print(f"   [0x{i*4:03X}] = 0x{instr:08X}")
-
-        print("\n2. Reading back instructions...")
-        all_pass = True
-        for i, expected in enumerate(instructions):
-            offset = CPU_INSTR_BASE + (i * 4)
-            read_val = cpu.read32(offset)
-            if read_val == expected:
-                print(f"   ✓ [0x{i*4:03X}] = 0x{read_val:08X}")
-            else:
-                print(f"   ✗ [0x{i*4:03X}] = 0x{read_val:08X} (expected 0x{expected:08X})")
-                all_pass = False
-
-        if all_pass:
-            print("\n   ✓ PASS - All instructions written and read correctly")
-
-def test_cpu_data_memory():
+    print("\n" + "="*60, file=out)
+    print("CPU INSTRUCTION MEMORY TEST", file=out)
+    print("="*60, file=out)
+
+    print("\n1. Writing instructions to memory...", file=out)
+
+    # Simple test program:
+    # 0x00: ADDI x1, x0, 5    (x1 = 5)
+    # 0x04: ADDI x2, x0, 10   (x2 = 10)
+    # 0x08: ADD  x3, x1, x2   (x3 = x1 + x2 = 15)
+    instructions = [
+        0x00500093,  # ADDI x1, x0, 5
+        0x00A00113,  # ADDI x2, x0, 10
+        0x002081B3,  # ADD x3, x1, x2
+    ]
+
+    cpu.write_block(CPU_INSTR_BASE, instructions)
+    print("\n".join(f"   [0x{i*4:03X}] = 0x{instr:08X}"
+                    for i, instr in enumerate(instructions)), file=out)
+
+    print("\n2. Reading back instructions...", file=out)
+    # Read the block once and report pass or fail from that same data
+    readback = cpu.read_block(CPU_INSTR_BASE, len(instructions))
+    if readback == instructions:
+        print(f"   ✓ PASS - {len(instructions)} instructions written and read correctly", file=out)
+    else:
+        print("\n".join(
+            f"   ✗ [0x{i*4:03X}] = 0x{read_val:08X} (expected 0x{expected:08X})"
+            for i, (expected, read_val) in enumerate(zip(instructions, readback))
+            if read_val != expected), file=out)
+
+def test_cpu_data_memory(cpu, out):
     """Test CPU data memory read/write"""
-    print("\n" + "="*60)
-    print("CPU DATA MEMORY TEST")
-    print("="*60)
-
-    with AXIDevice(CPU_BASE) as cpu:
-        print("\n1. Writing data to memory...")
-
-        test_data = [0xDEADBEEF, 0xCAFEBABE, 0x12345678, 0xABCDEF00]
-
-        for i, data in enumerate(test_data):
-            offset = CPU_DATA_BASE + (i * 4)
-            cpu.write32(offset, data)
-            time.sleep(0.001)  # Small delay after write
-            print(f"   [0x{offset:03X}] = 0x{data:08X}")
-
-        print("\n2. Reading back data...")
-        all_pass = True
-        for i, expected in enumerate(test_data):
-            offset = CPU_DATA_BASE + (i * 4)
-            read_val = cpu.read32(offset)
-            if read_val == expected:
-                print(f"   ✓ [0x{offset:03X}] = 0x{read_val:08X}")
-            else:
-                print(f"   ✗ [0x{offset:03X}] = 0x{read_val:08X} (expected 0x{expected:08X})")
-                all_pass = False
-
-        if all_pass:
-            print("\n   ✓ PASS - All data written and read correctly")
+    print("\n" + "="*60, file=out)
+    print("CPU DATA MEMORY TEST", file=out)
+    print("="*60, file=out)
+
+    print("\n1. Writing data to memory...", file=out)
+
+    test_data = [0xDEADBEEF, 0xCAFEBABE, 0x12345678, 0xABCDEF00]
+
+    cpu.write_block(CPU_DATA_BASE, test_data)
+    print("\n".join(f"   [0x{CPU_DATA_BASE + i*4:03X}] = 0x{data:08X}"
+                    for i, data in enumerate(test_data)), file=out)
+
+    print("\n2. Reading back data...", file=out)
+    # Read the block once and report pass or fail from that same data
+    readback = cpu.read_block(CPU_DATA_BASE, len(test_data))
+    if readback == test_data:
+        print(f"   ✓ PASS - {len(test_data)} data words written and read correctly", file=out)
+    else:
+        print("\n".join(
+            f"   ✗ [0x{CPU_DATA_BASE + i*4:03X}] = 0x{read_val:08X} (expected 0x{expected:08X})"
+            for i, (expected, read_val) in enumerate(zip(test_data, readback))
+            if read_val != expected), file=out)
+
+# Tests grouped by the peripheral they exercise, run in order
+GPU_TESTS = (
+    test_gpu_basic_rw,
+    test_gpu_math_unit,
+    test_gpu_pixel_draw,
+)
+
+CPU_TESTS = (
+    test_cpu_basic_rw,
+    test_cpu_instruction_memory,
+    test_cpu_data_memory,
+)
+
+def run_tests(dev, tests, failed, out):
+    """Run a group of tests against one device, stopping at the first error
+
+    The whole group reports into out. The name of the test that raised
+    is appended to failed, so the caller can tell an aborted group from
+    a finished one after join().
+    """
+    for test in tests:
+        try:
+            test(dev, out)
+        except Exception as e:
+            print(f"\n✗ ERROR in {test.__name__}: {e}\n", file=out)
+            traceback.print_exc(file=out)
+            failed.append(test.__name__)
+            return
 
 def main():
     """Run all tests"""
@@ -345,15 +526,45 @@ def main():
     print("="*60)
 
     try:
-        # GPU Tests
-        test_gpu_basic_rw()
-        test_gpu_math_unit()
-        test_gpu_pixel_draw()
-
-        # CPU Tests
-        test_cpu_basic_rw()
-        test_cpu_instruction_memory()
-        test_cpu_data_memory()
+        # One /dev/mem descriptor and one mapping per peripheral for the
+        # whole run
+        mem_fd = os.open('/dev/mem', os.O_RDWR)
+        gpu = GPUDevice(GPU_BASE, fd=mem_fd)
+        cpu = CPUDevice(CPU_BASE, fd=mem_fd)
+        failed = []
+        # One report buffer per group, written out in a fixed order
+        gpu_out = io.StringIO()
+        cpu_out = io.StringIO()
+        try:
+            if not (gpu.open() and cpu.open()):
+                print("\n✗ ERROR: Could not map the device registers\n")
+                return
+
+            # The GPU and CPU are separate AXI slaves with their own
+            # mappings, so each group gets a thread and its own device
+            threads = [
+                threading.Thread(target=run_tests,
+                                 args=(gpu, GPU_TESTS, failed, gpu_out),
+                                 name="gpu-tests"),
+                threading.Thread(target=run_tests,
+                                 args=(cpu, CPU_TESTS, failed, cpu_out),
+                                 name="cpu-tests"),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            sys.stdout.write(gpu_out.getvalue())
+            sys.stdout.write(cpu_out.getvalue())
+        finally:
+            gpu.close()
+            cpu.close()
+            os.close(mem_fd)
+
+        if failed:
+            print(f"\n✗ ERROR: Test suite aborted in {', '.join(failed)}\n")
+            return
 
         print("\n" + "="*60)
         print("TEST SUITE COMPLETE")
@@ -364,7 +575,6 @@ def main():
         print("Run this script with sudo: sudo python3 test_axi.py\n")
     except Exception as e:
         print(f"\n✗ ERROR: {e}\n")
-        import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":